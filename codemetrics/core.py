@@ -1,11 +1,12 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import os.path
 import typing
 
+import numpy as np
 import pandas as pd
 import lizard
+import scipy.sparse
 import sklearn
 import sklearn.cluster
 import sklearn.feature_extraction.text
@@ -43,11 +44,14 @@ def get_mass_changes(log: pd.DataFrame,
         revisions that had more files changed than the threshold.
 
     """
-    data = log.reset_index().copy()[['revision', 'path', 'added', 'removed']]
-    data['changes'] = data['added'] + data['removed']
-    data = data[['revision', 'path', 'changes']].\
-        groupby('revision', as_index=False).\
-        agg({'path': 'count', 'changes': 'sum'})
+    columns = ['revision', 'path', 'added', 'removed']
+    levels = [name for name in log.index.names if name in columns]
+    if levels:
+        log = log.reset_index(level=levels)
+    data = log[columns]
+    data = data.assign(changes=data['added'] + data['removed'])
+    data = data.groupby('revision', as_index=False, observed=True).\
+        agg(path=('path', 'count'), changes=('changes', 'sum'))
     data['changes_per_path'] = data['changes'] / data['path']
     if min_path is not None:
         data = data[data['path'] >= min_path]
@@ -79,10 +83,12 @@ def get_ages(data: pd.DataFrame,
     if by is None:
         by = ['path']
     now = pd.to_datetime(internals.get_now(), utc=True)
-    rv = data.groupby(by)['date'].max().reset_index()
-    rv['age'] = (now - pd.to_datetime(rv['date'], utc=True))
-    rv['age'] /= pd.Timedelta(1, unit='D')
-    return rv.drop(columns=['date'])
+    latest = data.groupby(by, observed=True)['date'].max()
+    if not isinstance(latest.dtype, pd.DatetimeTZDtype):
+        latest = pd.to_datetime(latest, utc=True)
+    rv = latest.index.to_frame(index=False)
+    rv['age'] = ((now - latest) / pd.Timedelta(1, unit='D')).values
+    return rv
 
 
 def get_hot_spots(log, loc, by=None, count_one_change_per=None):
@@ -107,13 +113,13 @@ def get_hot_spots(log, loc, by=None, count_one_change_per=None):
         by = 'path'
     if count_one_change_per is None:
         count_one_change_per = ['revision']
-    c_df = loc.copy()
-    c_df = c_df.rename(columns={'code': 'lines'})
+    c_df = loc.rename(columns={'code': 'lines'}, copy=False)
     columns = count_one_change_per + [by]
     ch_df = log[columns].drop_duplicates()[by]. \
         value_counts().to_frame('changes')
-    df = pd.merge(c_df, ch_df, right_index=True, left_on=by, how='outer'). \
-        fillna(0.0)
+    df = pd.merge(c_df, ch_df, left_on=by, right_index=True, how='outer',
+                  validate='many_to_one')
+    df.fillna(0.0, inplace=True)
     return df
 
 
@@ -138,16 +144,32 @@ def get_co_changes(log=None, by=None, on=None):
         by = 'path'
     if on is None:
         on = 'revision'
-    df = log[[on, by]].drop_duplicates()
-    sj = pd.merge(df, df, on=on).\
-        rename(columns={by + '_x': by, by + '_y': 'dependency'}).\
-        groupby([by, 'dependency']).count().reset_index()
-    result = pd.merge(sj[sj[by] == sj['dependency']][[by, on]],
-                      sj[sj[by] != sj['dependency']], on=by). \
-        rename(columns={on + '_x': 'changes', on + '_y': 'cochanges'})
+    on_codes, on_labels = pd.factorize(log[on])
+    by_codes, by_labels = pd.factorize(log[by], sort=True)
+    # Like groupby, ignore rows with a missing key (e.g. empty commits).
+    known = (on_codes >= 0) & (by_codes >= 0)
+    on_codes, by_codes = on_codes[known], by_codes[known]
+    # Incidence matrix (on x by) so that co-changes do not require a
+    # self-join: off-diagonal entries of M.T @ M are the cochanges.
+    incidence = scipy.sparse.csr_matrix(
+        (np.ones(len(on_codes), dtype='int64'), (on_codes, by_codes)),
+        shape=(len(on_labels), len(by_labels)))
+    # Duplicated (on, by) pairs are summed on construction: count them once.
+    incidence.data[:] = 1
+    # The diagonal of the product is the column sum of the 0/1 matrix.
+    changes = np.asarray(incidence.sum(axis=0)).ravel()
+    counts = (incidence.T @ incidence).tocsr()
+    counts.sort_indices()
+    counts = counts.tocoo()
+    off = counts.row != counts.col
+    row, col, data = counts.row[off], counts.col[off], counts.data[off]
+    result = pd.DataFrame(data={by: by_labels[row],
+                                'dependency': by_labels[col],
+                                'changes': changes[row],
+                                'cochanges': data})
     result['coupling'] = result['cochanges'] / result['changes']
-    return result[[by, 'dependency', 'changes', 'cochanges', 'coupling']]. \
-        sort_values(by='coupling', ascending=False)
+    order = np.argsort(-result['coupling'].values, kind='stable')
+    return result.iloc[order]
 
 
 def guess_components(paths, stop_words=None, n_clusters=8):
@@ -166,30 +188,35 @@ def guess_components(paths, stop_words=None, n_clusters=8):
         sklearn.cluster.MiniBatchKMeans
 
     """
-    data = list([p for p in paths])
-    dirs = [os.path.dirname(p.replace('\\', '/')) for p in data]
+    if isinstance(paths, pd.Series):
+        data = paths.to_numpy()
+    else:
+        data = np.asarray(list(paths), dtype='object')
+    dirs = pd.Series(data, dtype='object').\
+        str.replace('\\', '/', regex=False).str.rpartition('/')[0]
     vectorizer = sklearn.feature_extraction.text.TfidfVectorizer(
-        stop_words=stop_words)
+        stop_words=stop_words, dtype=np.float32)
     transformed_dirs = vectorizer.fit_transform(dirs)
     algo = sklearn.cluster.MiniBatchKMeans
     clustering = algo(compute_labels=True, n_clusters=n_clusters)
     clustering.fit(transformed_dirs)
 
+    feature_names = vectorizer.get_feature_names_out()
+
     def __cluster_name(center, threshold):
-        df = pd.DataFrame(data={'feature': vectorizer.get_feature_names(),
-                                'weight': center})
-        df.sort_values(by=['weight', 'feature'], ascending=False, inplace=True)
-        if (df['weight'] <= threshold).all():
+        selected = center > threshold
+        if not selected.any():
             return ''
-        df = df[df['weight'] > threshold]
-        return '.'.join(df['feature'].tolist())
+        features, weights = feature_names[selected], center[selected]
+        # Sort by decreasing weight, then decreasing feature name.
+        order = np.lexsort((features, weights))[::-1]
+        return '.'.join(features[order])
 
     cluster_names = [__cluster_name(center, 0.4)
                      for center in clustering.cluster_centers_]
-    components = [cluster_names[lbl] for lbl in clustering.labels_]
+    components = np.asarray(cluster_names, dtype='object')[clustering.labels_]
     rv = pd.DataFrame(data={'path': data, 'component': components})
-    rv.sort_values(by='component', inplace=True)
-    return rv
+    return rv.iloc[np.argsort(components, kind='stable')]
 
 
 # Exclude the parameters field for now.
@@ -92,6 +92,20 @@ class GetMassChangesTestCase(SimpleRepositoryFixture):
         actual = cm.get_mass_changes(self.log, max_changes_per_path=5.0)
         self.assertEqual(self.expected.query("revision == '1016'"), actual)
 
+    def test_get_mass_changes_ignores_missing_path(self):
+        """Revisions without path (e.g. merge commits) count no path."""
+        empty = self.log.iloc[[0]].assign(revision=1020, path=None,
+                                          added=np.nan, removed=np.nan)
+        log = pd.concat([self.log, empty], ignore_index=True)
+        actual = cm.get_mass_changes(log, min_path=1)
+        self.assertEqual([1016, 1018], actual['revision'].tolist())
+
+    def test_get_mass_changes_on_categorical_revision(self):
+        """Only report revisions found in a categorical revision column."""
+        log = self.log.astype({'revision': 'category'})
+        actual = cm.get_mass_changes(log[log['revision'] == 1018])
+        self.assertEqual([1018], actual['revision'].tolist())
+
 
 class AgeReportTestCase(SimpleRepositoryFixture):
     """Extends the repository scaffolding with an age report."""
@@ -133,6 +147,21 @@ class AgeReportTestCase(SimpleRepositoryFixture):
         actual = cm.get_ages(self.log.set_index(['revision', 'path']))
         self.assertEqual(self.expected, actual)
 
+    def test_ages_by_categorical_key(self):
+        """Only report the observed values of a categorical key."""
+        self.log['kind'] = pd.Categorical(self.log['kind'],
+                                          categories=['dir', 'file'])
+        actual = cm.get_ages(self.log, by=['path', 'kind'])
+        self.assertEqual(['file', 'file'], actual['kind'].tolist())
+        self.assertEqual(self.expected, actual[['path', 'age']])
+
+    def test_ages_without_date(self):
+        """A path whose dates are all missing has no age."""
+        self.log.loc[self.log['path'] == 'requirements.txt', 'date'] = pd.NaT
+        actual = cm.get_ages(self.log)
+        self.expected.loc[0, 'age'] = np.nan
+        self.assertEqual(self.expected, actual)
+
 
 class HotSpotReportTestCase(SimpleRepositoryFixture):
     """Extends the repository scaffolding with a hot spot report."""
@@ -194,6 +223,37 @@ class CoChangeTestCase(SimpleRepositoryFixture):
         ''')))
         self.assertEqual(expected, actual)
 
+    def test_co_change_report_with_many_paths(self):
+        """Count every pair of paths changed in the same revision."""
+        log = SimpleRepositoryFixture.get_log_df()
+        extra = log.iloc[[-1]].replace('requirements.txt', 'setup.py')
+        log = pd.concat([log, extra], ignore_index=True)
+        actual = cm.get_co_changes(log=log).\
+            sort_values(by=['path', 'dependency']).reset_index(drop=True)
+        expected = pd.read_csv(io.StringIO(textwrap.dedent('''
+        path,dependency,changes,cochanges,coupling
+        requirements.txt,setup.py,1,1,1.0
+        requirements.txt,stats.py,1,1,1.0
+        setup.py,requirements.txt,1,1,1.0
+        setup.py,stats.py,1,1,1.0
+        stats.py,requirements.txt,2,1,0.5
+        stats.py,setup.py,2,1,0.5
+        ''')))
+        self.assertEqual(expected, actual)
+
+    def test_co_change_report_ignores_missing_path(self):
+        """Revisions without path (e.g. merge commits) are ignored."""
+        log = SimpleRepositoryFixture.get_log_df()
+        empty = log.iloc[[0]].assign(revision=1020, path=None)
+        log = pd.concat([log, empty], ignore_index=True)
+        actual = cm.get_co_changes(log=log)
+        expected = pd.read_csv(io.StringIO(textwrap.dedent('''
+        path,dependency,changes,cochanges,coupling
+        requirements.txt,stats.py,1,1,1.0
+        stats.py,requirements.txt,2,1,0.5
+        ''')))
+        self.assertEqual(expected, actual)
+
 
 code_maat_dataset = pd.read_csv(io.StringIO(textwrap.dedent(r'''
 path,component